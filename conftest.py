@@ -0,0 +1 @@
+# Lets the tests import the top-level script modules when run with a bare `pytest`.
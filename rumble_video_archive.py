@@ -2,6 +2,7 @@
 
 The script automates video uploads to a website using Selenium.
 It is structured around two main classes: EnvLoader and VideoUploader.
+Video header metadata for titles and descriptions comes from the video_metadata module.
 EnvLoader Class:
 
 Manages environment variables.
@@ -15,19 +16,28 @@ Handles the video upload process.
 Initializes a Selenium WebDriver instance to control a web browser.
 login method logs into the Rumble website using credentials from environment variables.
 prepare_video_upload method creates a hidden file input element and sets the video file path.
-fill_video_details method fills in the video title, description, and sets the video category.
+fill_video_details method fills in the video title, description (rendered from the title/description templates), and sets the video category.
 upload_and_finalize method monitors the upload progress and finalizes the upload once it reaches 100%.
 Includes methods to interact with checkboxes on the webpage using different techniques.
 Utility Functions:
 
 get_my_documents_folder: Retrieves the path to the "My Documents" folder on a Windows system.
 find_first_video: Scans a directory for video files with specified extensions and returns the path of the first video file found.
+find_videos: Scans a directory for all video files with specified extensions.
+collect_metadata: Extracts header metadata for the scanned videos into the file index, never failing the upload.
 string_to_binary: Converts specific string values to binary (0 or 1).
 withScroll, withJavascript, withSel: Helper functions to interact with checkboxes on the webpage using different methods.
+video_metadata Module:
+
+read_video_metadata: Reads recording time, duration, resolution and codec from the MP4/MOV header boxes only, seeking past the media payload.
+MetadataIndex: Caches header metadata per video file in a JSON file index, invalidated when the file size or modification time changes.
+extract_metadata: Parses the header metadata of many files in a process pool, skipping files already cached in the MetadataIndex.
+render_template: Fills a title/description template with a video's metadata, falling back to the default template.
 Main Execution Block:
 
 Initializes an EnvLoader instance.
 Retrieves the folder path from environment variables.
+Finds the video files in the specified folder and extracts their header metadata into the file index.
 Finds the first video file in the specified folder.
 Creates a VideoUploader instance to perform the upload.
 perform_upload method orchestrates the entire upload process, ensuring the video is uploaded and the browser is properly cleaned up afterward.
@@ -43,6 +53,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import time
+from multiprocessing import freeze_support
 from datetime import datetime
 from dotenv import load_dotenv
 import sys
@@ -52,6 +63,13 @@ from ctypes import wintypes
 import traceback
 # Function to get the path
 from selenium.webdriver.chrome.options import Options
+from video_metadata import (
+    DEFAULT_TITLE_TEMPLATE,
+    DEFAULT_DESCRIPTION_TEMPLATE,
+    MetadataIndex,
+    extract_metadata,
+    render_template,
+)
 
 
 def get_my_documents_folder():
@@ -95,7 +113,11 @@ class EnvLoader:
                     open_log_when_done=True
                     monitor=True
                     headless_browser=False
-                    # or 0'''.replace('\t', ''))
+                    # available fields: {video_title} {date} {time} {datetime} {duration} {width} {height} {resolution} {codec} {filename}
+                    title_template=%s
+                    description_template=%s
+                    metadata_index=metadata_index.json
+                    # or 0'''.replace('\t', '') % (DEFAULT_TITLE_TEMPLATE, DEFAULT_DESCRIPTION_TEMPLATE))
 
     def load_env(self):
         """
@@ -109,14 +131,16 @@ class EnvLoader:
         else:
             load_dotenv(self.env_file_path)
 
-    def get_value(self, key):
+    def get_value(self, key, default=None):
         """
         Retrieves value for the specified environment variable key.
         
         :param key: Key of the environment variable
-        :return: Value of the environment variable or None if not found
+        :param default: Value returned when the key is not set
+        :return: Value of the environment variable or default if not found
         """
-        return os.getenv(key).strip()
+        value = os.getenv(key, default)
+        return value.strip() if value is not None else None
 
 
 def find_first_video(directory_path, file_extensions=['.mp4', '.mov']):
@@ -128,11 +152,28 @@ def find_first_video(directory_path, file_extensions=['.mp4', '.mov']):
     :param file_extensions: List of video file extensions to look for.
     :return: Path of the first video file found, or None if no video file is found.
     """
+    return next(iter_videos(directory_path, file_extensions), None)
+
+
+def find_videos(directory_path, file_extensions=['.mp4', '.mov']):
+    """
+    Scans the specified directory recursively for video files with specified extensions.
+
+    :param directory_path: Path of the directory to search in.
+    :param file_extensions: List of video file extensions to look for.
+    :return: List of paths of all video files found, in walk order.
+    """
+    return list(iter_videos(directory_path, file_extensions))
+
+
+def iter_videos(directory_path, file_extensions=['.mp4', '.mov']):
+    """
+    Lazily yields video files with specified extensions, so callers can stop at the first one.
+    """
     for root, dirs, files in os.walk(directory_path):
         for file in files:
             if any(file.lower().endswith(ext) for ext in file_extensions):
-                return os.path.join(root, file)
-    return None
+                yield os.path.join(root, file)
 
 
 def string_to_binary(input_string):
@@ -212,12 +253,30 @@ def getUrl(driver, open_log):
 def logger(e):
     with open('error.txt', 'w') as f:
         f.write(str(e))
-        f.write(traceback.format_exc(e))
+        f.write(traceback.format_exc())
+
+def collect_metadata(videos, env_loader):
+    """
+    Extracts header metadata for the scanned videos, cached in the file index.
+    Metadata only enriches the title/description, so any failure is logged and
+    the upload goes ahead without it.
+
+    :param videos: Paths of the video files found in the monitored folder.
+    :param env_loader: EnvLoader with the metadata_index setting.
+    :return: Dict mapping each video path to its metadata (None if unavailable).
+    """
+    try:
+        metadata_index = MetadataIndex(env_loader.get_value("metadata_index", "metadata_index.json"))
+        return extract_metadata(videos, metadata_index)
+    except Exception as e:
+        logger(e)
+        return {}
 
 class VideoUploader:
-    def __init__(self, video_path, env_loader, headless=False):
+    def __init__(self, video_path, env_loader, headless=False, metadata=None):
         self.video_path = video_path
         self.env_loader = env_loader
+        self.metadata = metadata
         self.driver = {}
         self.headless = string_to_binary(env_loader.get_value('headless_browser'))
         
@@ -263,11 +322,14 @@ class VideoUploader:
         time.sleep(2)
         
     def fill_video_details(self):
-        current_day_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         tit = self.env_loader.get_value('video_title')
+        title_template = self.env_loader.get_value('title_template')
+        description_template = self.env_loader.get_value('description_template')
+        title = render_template(title_template, tit, self.video_path, self.metadata, DEFAULT_TITLE_TEMPLATE)
+        description = render_template(description_template, tit, self.video_path, self.metadata, DEFAULT_DESCRIPTION_TEMPLATE)
 
-        self.driver.find_element(By.CSS_SELECTOR, "#title").send_keys(f'{tit} - {current_day_time}')
-        self.driver.find_element(By.CSS_SELECTOR, "#description").send_keys(f"{tit} stream archive")
+        self.driver.find_element(By.CSS_SELECTOR, "#title").send_keys(title)
+        self.driver.find_element(By.CSS_SELECTOR, "#description").send_keys(description)
         self.set_category("Entertainment", "Entertainment Life")
 
     def set_category(self, primary, secondary):
@@ -344,15 +406,18 @@ class VideoUploader:
         
         
 if __name__ == "__main__":
+    freeze_support()
     env_loader = EnvLoader()
     folder = env_loader.get_value("folder_path")
     first_found_video = None
     if 'true' in env_loader.get_value("monitor").lower().strip():
         while first_found_video == None:
             # try:
-            first_found_video = find_first_video(folder)
+            videos = find_videos(folder)
+            first_found_video = next(iter(videos), None)
             if first_found_video:
-                uploader = VideoUploader(first_found_video, env_loader)
+                video_metadata = collect_metadata(videos, env_loader)
+                uploader = VideoUploader(first_found_video, env_loader, metadata=video_metadata.get(first_found_video))
                 uploader.perform_upload()
             time.sleep(30)
             break
@@ -360,8 +425,10 @@ if __name__ == "__main__":
             #     logger(e)
     else:
         try:
-            first_found_video = find_first_video(folder)
-            uploader = VideoUploader(first_found_video, env_loader)
+            videos = find_videos(folder)
+            first_found_video = next(iter(videos), None)
+            video_metadata = collect_metadata(videos, env_loader)
+            uploader = VideoUploader(first_found_video, env_loader, metadata=video_metadata.get(first_found_video))
             uploader.perform_upload()
             time.sleep(30)
         except Exception as e:
@@ -0,0 +1,110 @@
+import os
+import struct
+from datetime import datetime, timezone
+
+from video_metadata import MetadataIndex, read_video_metadata, render_template
+
+# 2024-05-31 11:33:20 UTC in seconds since 1904-01-01
+CREATED = 3800000000
+CREATED_ISO = datetime(2024, 5, 31, 11, 33, 20, tzinfo=timezone.utc).isoformat()
+
+
+def box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def mvhd(version=0, creation=CREATED, timescale=1000, duration=125000):
+    if version == 1:
+        times = struct.pack('>QQIQ', creation, creation, timescale, duration)
+    else:
+        times = struct.pack('>IIII', creation, creation, timescale, duration)
+    return box(b'mvhd', bytes([version, 0, 0, 0]) + times + bytes(80))
+
+
+def trak(handler, codec, width=0, height=0):
+    tkhd = box(b'tkhd', bytes(4) + bytes(72) + struct.pack('>II', width << 16, height << 16))
+    mdhd = box(b'mdhd', bytes(4) + struct.pack('>IIII', 0, 0, 90000, 90000 * 125) + bytes(4))
+    hdlr = box(b'hdlr', bytes(8) + handler + bytes(12))
+    # QuickTime data handler inside minf, must not override the mdia handler
+    data_hdlr = box(b'hdlr', bytes(4) + b'dhlr' + b'url ' + bytes(12))
+    stsd = box(b'stsd', bytes(4) + struct.pack('>I', 1) + struct.pack('>I4s', 16, codec) + bytes(8))
+    minf = box(b'minf', data_hdlr + box(b'stbl', stsd))
+    return box(b'trak', tkhd + box(b'mdia', mdhd + hdlr + minf))
+
+
+def write(tmp_path, data, name='video.mp4'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def mp4(*boxes):
+    return box(b'ftyp', b'isom' + bytes(4)) + b''.join(boxes)
+
+
+def test_mvhd_version_0(tmp_path):
+    moov = box(b'moov', mvhd() + trak(b'vide', b'avc1', 1920, 1080))
+    metadata = read_video_metadata(write(tmp_path, mp4(moov)))
+    assert metadata == {
+        'creation_time': CREATED_ISO,
+        'duration': 125.0,
+        'width': 1920,
+        'height': 1080,
+        'codec': 'avc1',
+    }
+
+
+def test_mvhd_version_1(tmp_path):
+    moov = box(b'moov', mvhd(version=1, timescale=600, duration=600 * 90) + trak(b'vide', b'hvc1', 1280, 720))
+    metadata = read_video_metadata(write(tmp_path, mp4(moov)))
+    assert metadata['creation_time'] == CREATED_ISO
+    assert metadata['duration'] == 90.0
+    assert (metadata['width'], metadata['height'], metadata['codec']) == (1280, 720, 'hvc1')
+
+
+def test_moov_after_large_mdat(tmp_path):
+    payload = bytes(1 << 20)
+    mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + len(payload)) + payload
+    moov = box(b'moov', mvhd() + trak(b'vide', b'avc1', 1920, 1080))
+    metadata = read_video_metadata(write(tmp_path, mp4(mdat, moov)))
+    assert metadata['creation_time'] == CREATED_ISO
+    assert metadata['codec'] == 'avc1'
+
+
+def test_mov_picks_video_track_after_audio_track(tmp_path):
+    moov = box(b'moov', mvhd() + trak(b'soun', b'mp4a') + trak(b'vide', b'avc1', 1920, 1080))
+    metadata = read_video_metadata(write(tmp_path, mp4(moov), 'video.mov'))
+    assert (metadata['width'], metadata['height'], metadata['codec']) == (1920, 1080, 'avc1')
+
+
+def test_truncated_64_bit_size_falls_back_to_file_time(tmp_path):
+    metadata = read_video_metadata(write(tmp_path, b'\0\0\0\x01mdat\0\0'))
+    assert metadata['duration'] == 0
+    assert (metadata['width'], metadata['height'], metadata['codec']) == (0, 0, '')
+    assert datetime.fromisoformat(metadata['creation_time']).year >= 2024
+
+
+def test_metadata_index_hit_and_miss(tmp_path):
+    path = write(tmp_path, mp4(box(b'moov', mvhd())))
+    index = MetadataIndex(str(tmp_path / 'index.json'))
+    index.put(MetadataIndex.file_key(path), {'codec': 'avc1'})
+    index.save()
+
+    reloaded = MetadataIndex(str(tmp_path / 'index.json'))
+    assert reloaded.get(MetadataIndex.file_key(path)) == {'codec': 'avc1'}
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert reloaded.get(MetadataIndex.file_key(path)) is None
+
+    reloaded.put(MetadataIndex.file_key(path), {'codec': 'avc1'})
+    with open(path, 'ab') as f:
+        f.write(b'\0')
+    assert reloaded.get(MetadataIndex.file_key(path)) is None
+
+
+def test_render_template_falls_back_to_default():
+    metadata = {'creation_time': CREATED_ISO, 'duration': 125.0, 'width': 1920, 'height': 1080, 'codec': 'avc1'}
+    assert render_template('{video_title} {duration} {resolution}', 'T', 'a.mp4', metadata, '{video_title}') == 'T 0:02:05 1920x1080'
+    for bad in ('', None, '{video_title', '{video_title.x}', '{duration:d}', '{0}'):
+        assert render_template(bad, 'T', 'a.mp4', metadata, '{video_title} default') == 'T default'
@@ -0,0 +1,296 @@
+"""Header-only MP4/MOV metadata extraction for upload titles and descriptions.
+
+Reads the recording creation time, duration, resolution and codec from the
+mvhd/tkhd/mdhd/hdlr/stsd boxes, seeking past the media payload, and caches the
+results per file in a JSON file index.
+"""
+
+import os
+import json
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+
+# Defaults for the title/description templates, used when the .env setting is unset, empty or malformed.
+# Only fields that always have a value, so an unparsed recording still gets clean text.
+DEFAULT_TITLE_TEMPLATE = '{video_title} - {datetime}'
+DEFAULT_DESCRIPTION_TEMPLATE = '{video_title} stream archive, recorded {datetime}'
+
+
+# MP4/MOV timestamps count seconds from 1904-01-01 UTC
+MP4_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+# Boxes that only hold other boxes; everything else on the path is skipped by seeking
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+def iter_boxes(f, start, end):
+    """
+    Yields (type, payload_offset, payload_size) for each box between start and end.
+    Only the box headers are read; payloads are skipped with seek, so large
+    boxes such as mdat are never scanned.
+    """
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            largesize = f.read(8)
+            if len(largesize) < 8:
+                return  # truncated 64-bit size
+            size = struct.unpack('>Q', largesize)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset  # box extends to the end of the file
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, min(size, end - offset) - header_size
+        offset += size
+
+
+def parse_time_box(data):
+    """
+    Parses the creation time, timescale and duration of an mvhd or mdhd payload.
+    """
+    if data[0] == 1:
+        creation, _, timescale, duration = struct.unpack('>QQIQ', data[4:32])
+    else:
+        creation, _, timescale, duration = struct.unpack('>IIII', data[4:20])
+    return creation, timescale, duration
+
+
+def parse_tkhd(data):
+    """
+    Parses the width and height (16.16 fixed point) of a tkhd payload.
+    """
+    dims_offset = 88 if data[0] == 1 else 76
+    width, height = struct.unpack('>II', data[dims_offset:dims_offset + 8])
+    return width >> 16, height >> 16
+
+
+def read_box_tree(f, start, end, found, track, parent=None):
+    for box_type, offset, size in iter_boxes(f, start, end):
+        if box_type in CONTAINER_BOXES:
+            if box_type == b'trak':
+                track = {}
+                found['tracks'].append(track)
+            read_box_tree(f, offset, offset + size, found, track, box_type)
+            if box_type == b'moov':
+                return  # everything needed lives in moov, stop before any trailing mdat
+            continue
+        if box_type not in (b'mvhd', b'tkhd', b'mdhd', b'hdlr', b'stsd'):
+            continue
+        f.seek(offset)
+        data = f.read(min(size, 128))
+        try:
+            if box_type == b'mvhd':
+                found['mvhd'] = parse_time_box(data)
+            elif track is None:
+                continue
+            elif box_type == b'tkhd':
+                track['dimensions'] = parse_tkhd(data)
+            elif box_type == b'mdhd':
+                track['mdhd'] = parse_time_box(data)
+            elif box_type == b'hdlr':
+                # only the mdia handler names the track type, QuickTime also has a
+                # data handler (url /alis) in minf
+                if parent == b'mdia':
+                    track['handler'] = data[8:12]
+            elif box_type == b'stsd':
+                # first sample entry: size (4) followed by its format, e.g. avc1/hvc1
+                track['codec'] = data[12:16].decode('ascii', 'replace').strip()
+        except (struct.error, IndexError):
+            pass  # truncated box, keep whatever else was found
+
+
+def file_start_time(video_path, duration):
+    """
+    Estimates when a recording started from the file system, for headers without a creation time.
+    Uses the file creation time where the platform records it (Windows), otherwise
+    the modification time, which is when the recording ended, minus its duration.
+    """
+    stat = os.stat(video_path)
+    birthtime = getattr(stat, 'st_birthtime', None)
+    if birthtime is None and os.name == 'nt':
+        birthtime = stat.st_ctime  # ctime is the creation time on Windows
+    if birthtime is not None:
+        return birthtime
+    return stat.st_mtime - duration
+
+
+def read_video_metadata(video_path):
+    """
+    Reads recording metadata from the header boxes (mvhd/tkhd/mdhd) of an MP4/MOV file.
+    Falls back to the file modification time when the header carries no creation time.
+
+    :param video_path: Path of the video file.
+    :return: Dict with creation_time (ISO string), duration (seconds), width, height and codec.
+    """
+    found = {'mvhd': None, 'tracks': []}
+    with open(video_path, 'rb') as f:
+        read_box_tree(f, 0, os.fstat(f.fileno()).st_size, found, None)
+
+    video_track = next((t for t in found['tracks'] if t.get('handler') == b'vide'), None)
+    if video_track is None and found['tracks']:
+        video_track = found['tracks'][0]
+    video_track = video_track or {}
+
+    creation, duration = 0, 0.0
+    for box in (found['mvhd'], video_track.get('mdhd')):
+        if box is None:
+            continue
+        box_creation, timescale, box_duration = box
+        creation = creation or box_creation
+        if not duration and timescale:
+            duration = box_duration / timescale
+
+    if creation:
+        creation_time = MP4_EPOCH + timedelta(seconds=creation)
+    else:
+        creation_time = datetime.fromtimestamp(file_start_time(video_path, duration), timezone.utc)
+
+    width, height = video_track.get('dimensions', (0, 0))
+    return {
+        'creation_time': creation_time.isoformat(),
+        'duration': round(duration, 3),
+        'width': width,
+        'height': height,
+        'codec': video_track.get('codec', ''),
+    }
+
+
+class MetadataIndex:
+    def __init__(self, index_path="metadata_index.json"):
+        self.index_path = index_path
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """
+        Loads the file index from disk, starting empty if it is missing or unreadable.
+        """
+        try:
+            with open(self.index_path, 'r') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        with open(self.index_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+
+    @staticmethod
+    def file_key(video_path):
+        """
+        Returns the (path, size, mtime_ns) key identifying the current state of a video file.
+        """
+        stat = os.stat(video_path)
+        return os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, key):
+        """
+        Returns the cached metadata for a file_key, or None if it is missing or the file changed.
+        """
+        path, size, mtime = key
+        entry = self.entries.get(path)
+        if entry and entry['size'] == size and entry['mtime_ns'] == mtime:
+            return entry['metadata']
+        return None
+
+    def put(self, key, metadata):
+        """
+        Caches metadata under the file_key taken before the file was parsed, so a file
+        that changes while being parsed is parsed again next time.
+        """
+        path, size, mtime = key
+        self.entries[path] = {'size': size, 'mtime_ns': mtime, 'metadata': metadata}
+
+    def prune(self):
+        """
+        Drops entries of files that no longer exist, e.g. videos deleted after upload.
+        """
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+
+
+def extract_metadata(video_paths, index, max_workers=None):
+    """
+    Reads header metadata for every video not already cached in the index,
+    spreading the files over a process pool, and saves the pruned, updated index.
+    Metadata is optional: files that vanish or fail to parse get None, and an
+    index that cannot be written is only reported.
+
+    :param video_paths: Paths of the video files.
+    :param index: MetadataIndex used as cache.
+    :param max_workers: Process pool size, defaults to the CPU count.
+    :return: Dict mapping each video path to its metadata (None if it could not be parsed).
+    """
+    results = {}
+    pending = {}
+    for path in video_paths:
+        try:
+            key = index.file_key(path)
+            results[path] = index.get(key)
+        except OSError as e:
+            # e.g. renamed or deleted by the recorder between the scan and the stat
+            print(f"Could not read metadata of {path}: {e}")
+            results[path] = None
+            continue
+        if results[path] is None:
+            pending[path] = key
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {path: pool.submit(read_video_metadata, path) for path in pending}
+            for path, future in futures.items():
+                try:
+                    results[path] = future.result()
+                    index.put(pending[path], results[path])
+                except Exception as e:
+                    print(f"Could not read metadata of {path}: {e}")
+    index.prune()
+    try:
+        index.save()
+    except OSError as e:
+        print(f"Could not save metadata index {index.index_path}: {e}")
+    return results
+
+
+class TemplateFields(dict):
+    def __missing__(self, key):
+        # leave unknown placeholders visible instead of failing the upload
+        return '{' + key + '}'
+
+
+def render_template(template, video_title, video_path, metadata, default_template):
+    """
+    Fills a title/description template with the metadata of a video.
+    Fields: video_title, date, time, datetime, duration, width, height, resolution, codec, filename.
+    An empty or malformed template is replaced by default_template.
+    """
+    metadata = metadata or {}
+    if 'creation_time' in metadata:
+        created = datetime.fromisoformat(metadata['creation_time']).astimezone()
+    else:
+        created = datetime.now()
+    width, height = metadata.get('width', 0), metadata.get('height', 0)
+    fields = TemplateFields(
+        video_title=video_title,
+        date=created.strftime("%Y-%m-%d"),
+        time=created.strftime("%H:%M:%S"),
+        datetime=created.strftime("%Y-%m-%d %H:%M:%S"),
+        duration=str(timedelta(seconds=int(metadata.get('duration', 0)))),
+        width=width,
+        height=height,
+        resolution=f"{width}x{height}" if width and height else "",
+        codec=metadata.get('codec', ''),
+        filename=os.path.splitext(os.path.basename(video_path))[0],
+    )
+    if template:
+        try:
+            return template.format_map(fields)
+        except (ValueError, KeyError, AttributeError, IndexError) as e:
+            print(f"Invalid template {template!r}, using the default: {e}")
+    return default_template.format_map(fields)